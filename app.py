@@ -1,95 +1,359 @@
-import os, sqlite3
+import importlib, os, sqlite3, threading
+import streamlit as st
+
+import core  # stdlib-only until a pandas-backed name is touched (see core/__init__.py)
+from core import DB, TBL, METRICS, TIERS, VIEW_COLS
+
+st.set_page_config("Secure Dashboard + Log Analysis", layout="wide")
+
+@st.cache_resource(show_spinner=False)
+def ensure_schema():
+    # Raises (and is retried next run) if the table is not there yet
+    return core.ensure_schema(DB)
+
+@st.cache_resource(show_spinner=False)
+def _log_store():
+    # Shared by all sessions: one view per column projection, each holding the rows
+    # loaded so far + highest id in them (id is AUTOINCREMENT).
+    return {"views": {}, "lock": threading.Lock()}
+
+def _preload(store):
+    # Background warm-up while the login form is shown: analytics imports, pyramid, full view
+    for mod in ("data", "stats", "sampling", "report", "pyramid", "sketch"):
+        importlib.import_module(f"core.{mod}")  # pandas/numpy come in with these
+    if not os.path.exists(DB):
+        return
+    try:
+        core.ensure_schema(DB)
+        core.sync_pyramid(DB)
+        core.sync_sketches(DB)
+        with store["lock"], sqlite3.connect(DB) as conn:
+            v = store["views"].get(VIEW_COLS)
+            if v is None or v["last_id"] == 0:
+                df, last_id = core.read_rows(conn, 0, VIEW_COLS)
+                store["views"][VIEW_COLS] = {"df": df, "last_id": last_id}
+    except Exception:
+        pass  # no DB yet / read-only dir: the pages load (and report) on demand
+
+@st.cache_resource(show_spinner=False)
+def _warm_up():
+    # Once per process; the pages use SQL aggregates until the full view is in the store
+    t = threading.Thread(target=_preload, args=(_log_store(),), name="warm-up", daemon=True)
+    t.start()
+    return t
+
+# ---------- Session defaults ----------
+st.session_state.setdefault("logged_in", False)
+st.session_state.setdefault("thr", {"cpu": 80, "memory": 85, "disk": 90})
+st.session_state.setdefault("chart", {"points": 2000, "method": "lttb"})
+st.session_state.setdefault("raw", {"before": None, "after": None})
+
+# ---------- Login ----------
+def login():
+    st.title("🔐 Login")
+    u = st.text_input("Username")
+    p = st.text_input("Password", type="password")
+    if st.button("Login"):
+        if u == "admin" and p == "admin123":
+            st.session_state.logged_in = True
+            st.rerun()
+        else:
+            st.error("Invalid username or password.")
+
+if not st.session_state.logged_in:
+    _warm_up()
+    login()
+    st.stop()
+
+# ---------- Analytics imports (only reached after login) ----------
+import gzip, importlib.util, tempfile
 from io import BytesIO
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-DB, TBL = "log.db", "system_log"
-st.set_page_config("Secure Dashboard + Log Analysis", layout="wide")
+from core import (
+    PDF_POINTS, to_epoch, read_rows, read_window, read_tail, append_rows,
+    read_summary, read_alerts, build_range_index, extend_range_index, range_summary, window_sorted, count_above, threshold_sweep,
+    alert_masks,
+    report_lines, downsample, trend_charts, pdf_bytes,
+    sync_pyramid, pyramid_window, bucket_extremes, sync_sketches, window_quantiles, raw_counts, quantiles,
+    write_csv, write_arrow,
+)
 
-# ---------- Minimal PDF generator (no external libs) ----------
-def pdf_bytes(lines):
-    y, lh = 760, 14
-    esc = lambda s: s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
-    stream = "BT /F1 12 Tf " + " ".join(
-        [f"1 0 0 1 50 {y-i*lh} Tm ({esc(l)}) Tj" for i, l in enumerate(lines)]
-    ) + " ET"
-    sb = stream.encode("latin-1")
-
-    o = [
-        b"%PDF-1.4\n",
-        b"1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n",
-        b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n",
-        b"3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
-        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >> endobj\n",
-        b"4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj\n",
-        b"5 0 obj << /Length %d >> stream\n" % len(sb) + sb + b"\nendstream endobj\n",
-    ]
-
-    off, out = [], b""
-    for p in o:
-        off.append(len(out)); out += p
-    xref_pos = len(out)
-    xref = b"xref\n0 6\n0000000000 65535 f \n" + b"".join(
-        [f"{off[i]:010d} 00000 n \n".encode() for i in range(1, 6)]
-    )
-    out += xref + b"trailer << /Size 6 /Root 1 0 R >>\nstartxref\n" + str(xref_pos).encode() + b"\n%%EOF"
-    return out
+MIN_POINTS = 300  # pick_tier(): coarsest tier that still gives this many points
+TAIL_ROWS = 360  # live mode: ~1 h of ~10 s samples
+LATEST_TTL = 5  # safety bound only: latest_rows() is keyed on MAX(id)
 
 # ---------- Data loader ----------
-@st.cache_data(show_spinner=False)
-def load_df():
+def data_version():
+    # (MAX(id), MAX(ts_epoch)): two index lookups that only change when the logger appends rows.
+    # Cheaper to poll than PRAGMA data_version, which needs one long-lived connection per process.
+    if not os.path.exists(DB):
+        return (0, 0)
+    try:
+        ensure_schema()
+        with sqlite3.connect(DB) as conn:
+            row = conn.execute(f"SELECT MAX(id), MAX(ts_epoch) FROM {TBL}").fetchone()
+    except Exception:
+        return (0, 0)
+    return tuple(x or 0 for x in row)
+
+def _window_version(end, dv):
+    # Append-only log: a window closing before the newest row can no longer change,
+    # so it keeps one cache entry instead of being invalidated by every new row
+    max_id, max_ts = dv
+    return max_id if end is None or end >= max_ts else 0
+
+def load_df(dv, cols=VIEW_COLS):
+    if not os.path.exists(DB):
+        return pd.DataFrame()
+    store = _log_store()
+    with store["lock"]:
+        v = store["views"].setdefault(tuple(cols), {"df": pd.DataFrame(), "last_id": 0})
+        max_id = dv[0]
+        if max_id == v["last_id"]:
+            return v["df"]
+        if max_id < v["last_id"]:
+            # Table was recreated/truncated → start over (gen tells the range index)
+            v["df"], v["last_id"], v["gen"] = pd.DataFrame(), 0, v.get("gen", 0) + 1
+        try:
+            with sqlite3.connect(DB) as conn:
+                new, v["last_id"] = read_rows(conn, v["last_id"], cols)
+        except Exception:
+            return v["df"]
+        if not new.empty:
+            v["df"] = new if v["df"].empty else append_rows(v["df"], new)
+        return v["df"]
+
+def load_window(dv, start=None, end=None, cols=VIEW_COLS):
+    # start/end are epoch seconds (see to_epoch), range-scanned on idx_system_log_ts_epoch
+    return _load_window(start, end, tuple(cols), _window_version(end, dv))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _load_window(start, end, cols, version):
     if not os.path.exists(DB):
         return pd.DataFrame()
     try:
         with sqlite3.connect(DB) as conn:
-            df = pd.read_sql_query(f"SELECT * FROM {TBL}", conn)
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-        return df
+            return read_window(conn, start, end, cols)
     except Exception:
         return pd.DataFrame()
 
-def stats_for(df):
-    out = {}
-    for k in ["cpu", "memory", "disk"]:
-        if k in df.columns and len(df) > 0:
-            out[k] = (float(df[k].mean()), float(df[k].max()), float(df[k].min()))
-        else:
-            out[k] = (0.0, 0.0, 0.0)
-    return out
+def load_summary(dv, start=None, end=None):
+    # Rows, time span, stats and alert counts of a time_filter_ui() window (see read_summary),
+    # memoized per (window, thresholds, data version) and reused by every tab and export;
+    # "pct" (p50/p95/p99) is cached per time span only, thresholds do not change it
+    s = _load_summary(start, end, dict(st.session_state.thr), _window_version(end, dv), dv)
+    if s["span"] is not None:
+        lo, hi = s["span"]
+        s["pct"] = _load_quantiles(lo, hi, _window_version(hi, dv))
+    return s
+
+@st.cache_data(show_spinner=False, max_entries=32)  # least recently used entry is evicted first
+def _load_summary(start, end, thr, version, _dv):
+    # _dv: not part of the cache key (underscore), only needed on a miss
+    rs = range_index(_dv)
+    if rs is not None:
+        with rs["lock"]:
+            return range_summary(rs["ix"], thr, start, end)
+    with sqlite3.connect(DB) as conn:
+        return read_summary(conn, thr, start, end)
+
+def range_index(dv):
+    # Block sums/counts + sparse tables over the shared full view: any window is then two
+    # searchsorted + O(BLOCK). None while the warm-up thread is still loading the view
+    # → one SQL aggregate per window. If it finished without one (no DB/table yet, empty
+    # log), the view is loaded here once rows exist; after that load_df() only appends.
+    # Returns the store: read the index under its lock.
+    v = _log_store()["views"].get(VIEW_COLS)
+    if (v is None or v["df"].empty) and (dv[0] == 0 or _warm_up().is_alive()):
+        return None
+    df = load_df(dv)
+    if df.empty:
+        return None
+    gen = _log_store()["views"][VIEW_COLS].get("gen", 0)
+    rs = _range_store()
+    with rs["lock"]:
+        # New rows are appended to the index; a recreated table or out-of-order rows rebuild it
+        if (rs["ix"] is None or rs["gen"] != gen or len(df) < rs["rows"]
+                or not extend_range_index(rs["ix"], df.iloc[rs["rows"]:])):
+            rs["ix"] = build_range_index(df)
+        rs["rows"], rs["gen"] = len(df), gen
+    return rs
+
+@st.cache_resource(show_spinner=False)
+def _range_store():
+    # One index per process, extended in place
+    return {"ix": None, "rows": 0, "gen": 0, "lock": threading.Lock()}
+
+def sorted_window(dv, start=None, end=None):
+    # {metric: sorted values} of a window ({} without data): alert count for any threshold = one searchsorted
+    rs = range_index(dv)
+    if rs is not None:
+        return _sorted_window(start, end, _window_version(end, dv), rs)
+    # Before the warm-up: sort just the window's rows
+    df = load_window(dv, start, end, ("cpu", "memory", "disk"))
+    if df.empty:
+        return {}
+    return {k: np.sort(v[~np.isnan(v)]) for k, v in ((k, df[k].to_numpy()) for k in df.columns)}
 
-def highlight_alerts(df, thr):
-    def _style(row):
-        styles = []
-        for col in row.index:
-            if col in ["cpu", "memory", "disk"]:
-                try:
-                    styles.append("background-color:#ffd6d6" if float(row[col]) > thr[col] else "")
-                except Exception:
-                    styles.append("")
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _sorted_window(start, end, version, _rs):
+    # Shared and read-only (cache_resource: no copy per session)
+    with _rs["lock"]:
+        return window_sorted(_rs["ix"], start, end)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_quantiles(lo, hi, version):
+    try:
+        sync_sketches(DB)
+        return window_quantiles(DB, lo, hi)
+    except Exception:
+        pass  # e.g. read-only directory: bucket the window's raw rows instead
+    with sqlite3.connect(DB) as conn:
+        return {m: quantiles(c) for m, c in raw_counts(conn, lo, hi).items()}
+
+def load_alerts(dv, start=None, end=None):
+    return _load_alerts(start, end, dict(st.session_state.thr), _window_version(end, dv))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_alerts(start, end, thr, version):
+    with sqlite3.connect(DB) as conn:
+        return read_alerts(conn, thr, start, end)
+
+def load_last(dv, start=None, end=None, n=10):
+    return _load_last(start, end, n, _window_version(end, dv))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_last(start, end, n, version):
+    with sqlite3.connect(DB) as conn:
+        return read_window(conn, start, end, VIEW_COLS, last=n)
+
+def span_text(summary, sep=" → "):
+    # Time range of a summary as text (epoch seconds → naive UTC wall clock, like the logger)
+    if summary["span"] is None:
+        return "N/A"
+    return sep.join(str(pd.Timestamp(e, unit="s")) for e in summary["span"])
+
+def ts_bounds(dv):
+    return _ts_bounds(dv)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _ts_bounds(version):
+    if not os.path.exists(DB):
+        return None
+    try:
+        with sqlite3.connect(DB) as conn:
+            lo, hi = conn.execute(
+                f"SELECT MIN(ts_epoch), MAX(ts_epoch) FROM {TBL}"
+            ).fetchone()
+    except Exception:
+        return None
+    lo, hi = pd.to_datetime([lo, hi], unit="s")
+    return None if pd.isna(lo) or pd.isna(hi) else (lo, hi)
+
+@st.cache_data(show_spinner=False, ttl=LATEST_TTL, max_entries=4)
+def latest_rows(max_id, n=1):
+    # Newest n rows by primary key: constant time whatever the table size; max_id (dv[0]) keys
+    # the cache, so new rows show up on the same rerun as the charts keyed on dv
+    if not os.path.exists(DB):
+        return pd.DataFrame()
+    try:
+        with sqlite3.connect(DB) as conn:
+            return read_tail(conn, n)[0]
+    except Exception:
+        return pd.DataFrame()
+
+def load_tail(dv, n=TAIL_ROWS):
+    # Live mode: the last n rows once, then per poll only rows past this session's watermark
+    buf = st.session_state.get("tail")
+    try:
+        with sqlite3.connect(DB) as conn:
+            if buf is None or buf["n"] != n or dv[0] < buf["last_id"]:
+                df, last_id = read_tail(conn, n)
             else:
-                styles.append("")
-        return styles
-    return df.style.apply(_style, axis=1)
+                new, last_id = read_rows(conn, buf["last_id"], VIEW_COLS)
+                df = buf["df"] if new.empty else append_rows(buf["df"], new).tail(n).reset_index(drop=True)
+    except Exception:
+        return pd.DataFrame() if buf is None else buf["df"]
+    st.session_state.tail = {"df": df, "last_id": last_id, "n": n}
+    return df
+
+def read_page(before=None, size=50, after=None):
+    with sqlite3.connect(DB) as conn:
+        return core.read_page(conn, before, size, after)
+
+def id_after(ts):
+    with sqlite3.connect(DB) as conn:
+        return core.id_after(conn, ts)
+
+# ---------- Trends (pyramid in core.pyramid, then rollup tiers, then raw rows) ----------
+def pick_tier(start, end, min_points=MIN_POINTS):
+    # Coarsest rollup tier with at least min_points buckets in [start, end]; None → raw rows
+    for name, sec in TIERS.items():
+        if (end - start) / sec >= min_points:
+            return name
+    return None
+
+def load_trend(dv, start=None, end=None, points=2000):
+    # Per-bucket min/max pairs for charting; returns (frame indexed by timestamp, resolution label or None)
+    bounds = ts_bounds(dv)
+    if bounds is None:
+        return pd.DataFrame(), None
+    lo = to_epoch(bounds[0]) if start is None else start
+    hi = to_epoch(bounds[1]) if end is None else end
+    return _load_trend(lo, hi, points, _window_version(hi, dv))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _load_trend(lo, hi, points, version):
+    try:
+        sync_pyramid(DB)
+        return pyramid_window(DB, lo, hi, points)
+    except Exception:
+        pass  # e.g. read-only directory: fall back to the rollup tiers
+    tier = pick_tier(lo, hi)
+    if tier is None:
+        df = _load_window(lo, hi, ("timestamp", *METRICS), version)
+        return df.dropna(subset=["timestamp"]).set_index("timestamp")[METRICS], None
+    sec = TIERS[tier]
+    ext = ", ".join(f"{m}_min, {m}_max" for m in METRICS)
+    try:
+        with sqlite3.connect(DB) as conn:
+            df = pd.read_sql_query(
+                f"SELECT bucket AS timestamp, {ext} FROM {TBL}_{tier} "
+                "WHERE bucket BETWEEN ? AND ? ORDER BY bucket",
+                conn, params=(lo // sec * sec, hi),
+            )
+    except Exception:
+        return pd.DataFrame(), None
+    return bucket_extremes(df, sec), f"{tier} (min/max)"
 
-def time_filter_ui(df):
-    if "timestamp" not in df.columns:
-        st.info("No timestamp column → filter waktu tidak tersedia.")
-        return df, "All"
+# ---------- Alerts ----------
+ALERT_STYLE = "background-color:#ffd6d6"
 
-    df2 = df.dropna(subset=["timestamp"]).copy()
-    if df2.empty:
+def highlight_alerts(df, thr):
+    def _style(d):
+        out = np.full(d.shape, "", dtype=object)
+        for c, m in alert_masks(d, thr).items():
+            out[m, d.columns.get_loc(c)] = ALERT_STYLE
+        return pd.DataFrame(out, index=d.index, columns=d.columns)
+    return df.style.apply(_style, axis=None)
+
+def time_filter_ui(dv):
+    # Returns (start, end, label); start/end are epoch seconds or None, queried by load_window()
+    bounds = ts_bounds(dv)
+    if bounds is None:
         st.info("Timestamp tidak valid (semua NaT) → filter waktu tidak tersedia.")
-        return df, "All"
+        return None, None, "All"
 
     choice = st.selectbox("Filter waktu", ["All", "7 days", "14 days", "30 days", "90 days", "Custom"], index=2)
     if choice == "All":
-        return df2, "All"
+        return None, None, "All"
 
     if choice == "Custom":
-        min_d = df2["timestamp"].min().date()
-        max_d = df2["timestamp"].max().date()
+        min_d = bounds[0].date()
+        max_d = bounds[1].date()
         col1, col2 = st.columns(2)
         with col1:
             start = st.date_input("Start date", value=min_d, min_value=min_d, max_value=max_d)
@@ -98,41 +362,43 @@ def time_filter_ui(df):
 
         start_ts = pd.Timestamp(start)
         end_ts = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-        f = df2[(df2["timestamp"] >= start_ts) & (df2["timestamp"] <= end_ts)]
-        return f, f"Custom: {start} to {end}"
+        return to_epoch(start_ts), to_epoch(end_ts), f"Custom: {start} to {end}"
 
     days = int(choice.split()[0])
-    cutoff = pd.Timestamp.now(tz=None) - pd.Timedelta(days=days)
-    f = df2[df2["timestamp"] >= cutoff]
-    return f, f"Last {days} days"
-
-# ---------- Session defaults ----------
-st.session_state.setdefault("logged_in", False)
-st.session_state.setdefault("thr", {"cpu": 80, "memory": 85, "disk": 90})
-
-# ---------- Login ----------
-def login():
-    st.title("🔐 Login")
-    u = st.text_input("Username")
-    p = st.text_input("Password", type="password")
-    if st.button("Login"):
-        if u == "admin" and p == "admin123":
-            st.session_state.logged_in = True
-            st.rerun()
-        else:
-            st.error("Invalid username or password.")
-
-# ---------- Pages ----------
-def page_dashboard(df):
-    st.title("🌐 Secure Data Center Dashboard")
-
-    if df.empty:
-        st.warning("Database not found / table empty. Pastikan log.db dan tabel system_log ada.")
-        return
-
-    latest = df.iloc[-1]
-    t = st.session_state.thr
-
+    # Floor to the minute so reruns within the same minute reuse the cached window
+    cutoff = pd.Timestamp.now(tz=None).floor("min") - pd.Timedelta(days=days)
+    return to_epoch(cutoff), None, f"Last {days} days"
+
+# ---------- Export (streamed from SQLite by core.export, cached per window + data version) ----------
+def csv_export(start, end, cols):
+    # Streamed to a temp file, then read once: download_button needs the bytes, so the plain CSV
+    # stays O(rows) in memory; not cached, a pickled st.cache_data copy would double it again
+    with tempfile.TemporaryFile() as tmp:
+        write_csv(tmp, DB, start, end, cols)
+        tmp.seek(0)
+        return tmp.read()
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def csv_gz_export(start, end, cols, version):
+    # Chunks are compressed into a temp file as they stream; only the .gz bytes end up in memory
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+            write_csv(gz, DB, start, end, cols)
+        tmp.seek(0)
+        return tmp.read()
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def arrow_export(fmt, start, end, cols, version):
+    with tempfile.TemporaryFile() as tmp:
+        write_arrow(tmp, fmt, DB, start, end, cols)
+        tmp.seek(0)
+        return tmp.read()
+
+def line_chart(plot):
+    c = st.session_state.chart
+    st.line_chart(downsample(plot, c["points"], c["method"], st.session_state.thr))
+
+def kpis(latest, t):
     # KPI
     st.subheader("✅ KPI (Latest Reading)")
     c1, c2, c3 = st.columns(3)
@@ -143,12 +409,48 @@ def page_dashboard(df):
     # Status
     st.subheader("🚨 Status (Latest vs Threshold)")
     for k in ["cpu", "memory", "disk"]:
-        if k not in df.columns:
+        if k not in latest.index:
             st.warning(f"Kolom '{k}' tidak ada di database.")
             continue
-        msg = f"{k.upper()}: {latest[k]}% (threshold {t[k]}%)"
+        msg = f"{k.upper()}: {float(latest[k]):g}% (threshold {t[k]}%)"
         (st.error if float(latest[k]) > t[k] else st.success)(msg)
 
+def live_controls():
+    c1, c2 = st.columns([1, 3])
+    live = c1.toggle("🔴 Live mode", key="live")
+    every = c2.selectbox("Poll every", [2, 5, 10, 30], index=1, format_func=lambda x: f"{x} s",
+                         key="live_every", disabled=not live)
+    return live, every
+
+def _live_panel(t):
+    # Runs on its own timer (fragment), so it polls the data version itself
+    tail = load_tail(data_version())
+    if tail.empty:
+        st.info("Belum ada data.")
+        return
+    kpis(tail.iloc[-1], t)
+    st.subheader("📡 Live Tail")
+    line_chart(tail.set_index("timestamp")[["cpu", "memory", "disk"]])
+    st.caption(f"Last {len(tail)} readings · latest {tail['timestamp'].iloc[-1]}")
+
+# ---------- Pages ----------
+def page_dashboard(dv):
+    st.title("🌐 Secure Data Center Dashboard")
+
+    # Top section only needs the newest rows, never the full history
+    df = latest_rows(dv[0], 10)
+    if df.empty:
+        st.warning("Database not found / table empty. Pastikan log.db dan tabel system_log ada.")
+        return
+
+    t = st.session_state.thr
+    live, every = live_controls()
+    if live:
+        # Fragment reruns on its own timer: KPIs + chart tail only, nothing else re-renders
+        st.fragment(run_every=every)(_live_panel)(t)
+    else:
+        kpis(df.iloc[-1], t)
+
     st.subheader("📊 Latest Logs (highlight alerts)")
     try:
         st.dataframe(highlight_alerts(df.tail(10), t), use_container_width=True)
@@ -166,37 +468,58 @@ def page_dashboard(df):
     use_cols = cols_map[trend_choice]
 
     try:
-        if "timestamp" in df.columns:
-            plot = df.dropna(subset=["timestamp"]).set_index("timestamp")[use_cols]
-        else:
-            plot = df[use_cols]
-        st.line_chart(plot)
+        plot, tier = load_trend(dv, points=st.session_state.chart["points"])
+        line_chart(plot[use_cols])
+        st.caption(f"Resolution: {tier or 'raw'}")
     except Exception as e:
         st.warning(f"Could not plot chart: {e}")
 
-def page_config():
+def page_config(dv):
     st.title("⚙️ Configuration Panel")
     t = st.session_state.thr
-    t["cpu"] = st.slider("CPU Threshold (%)", 0, 100, int(t["cpu"]))
-    t["memory"] = st.slider("Memory Threshold (%)", 0, 100, int(t["memory"]))
-    t["disk"] = st.slider("Disk Threshold (%)", 0, 100, int(t["disk"]))
+    # Keyed: an unkeyed slider whose value comes from t is a new widget after each change (next move lost)
+    t["cpu"] = st.slider("CPU Threshold (%)", 0, 100, int(t["cpu"]), key="thr_cpu")
+    t["memory"] = st.slider("Memory Threshold (%)", 0, 100, int(t["memory"]), key="thr_memory")
+    t["disk"] = st.slider("Disk Threshold (%)", 0, 100, int(t["disk"]), key="thr_disk")
+
+    # What-if: counts for the slider values and for every threshold 0–100, from sorted values
+    st.subheader("🎯 Threshold What-if")
+    with st.expander("🕒 Filter Waktu", expanded=False):
+        start, end, label = time_filter_ui(dv)
+    sv = sorted_window(dv, start, end)
+    if not sv:
+        st.info("No data found.")
+    else:
+        cols = st.columns(3)
+        for col, (k, name) in zip(cols, {"cpu": "CPU", "memory": "Memory", "disk": "Disk"}.items()):
+            col.metric(f"{name} > {t[k]}%", int(count_above(sv[k], t[k])), help=f"of {len(sv[k])} readings ({label})")
+        st.line_chart(threshold_sweep(sv), x_label="Threshold (%)", y_label="Alert count")
+
+    st.subheader("📈 Charts")
+    c = st.session_state.chart
+    c["points"] = st.number_input("Max points per series", 200, 20000, int(c["points"]), step=100)
+    methods = {"lttb": "LTTB (shape-preserving)", "minmax": "Min/Max envelope"}
+    c["method"] = st.radio("Downsampling", list(methods), index=list(methods).index(c["method"]),
+                           format_func=methods.get, horizontal=True)
     if st.button("💾 Save"):
         st.session_state.thr = t
+        st.session_state.chart = c
         st.success("Saved!")
 
-def page_analysis(df):
+def page_analysis(dv):
     st.title("📊 Log Analysis & Reporting")
 
-    if df.empty:
+    if dv[0] == 0:
         st.warning("No data found.")
         return
 
-    # Filter waktu
+    # Filter waktu (pushed down to SQL: the summary is one aggregate query, no rows are loaded)
     with st.expander("🕒 Filter Waktu", expanded=True):
-        df_f, label = time_filter_ui(df)
-        st.caption(f"Filter: **{label}** | Rows: **{len(df_f)}**")
+        start, end, label = time_filter_ui(dv)
+        summary = load_summary(dv, start, end)
+        st.caption(f"Filter: **{label}** | Rows: **{summary['rows']}**")
 
-    if df_f.empty:
+    if summary["rows"] == 0:
         st.warning("Hasil filter kosong. Coba pilih range yang lebih luas.")
         return
 
@@ -205,27 +528,35 @@ def page_analysis(df):
 
     # Overview
     with tab1:
-        s = stats_for(df_f)
+        s = summary["stats"]
         st.subheader("📌 Key Statistics")
         c1, c2, c3 = st.columns(3)
         (a,b,c) = s["cpu"]; c1.metric("Avg CPU (%)", f"{a:.2f}"); c1.write(f"Max: {b:.2f}%"); c1.write(f"Min: {c:.2f}%")
         (a,b,c) = s["memory"]; c2.metric("Avg Memory (%)", f"{a:.2f}"); c2.write(f"Max: {b:.2f}%"); c2.write(f"Min: {c:.2f}%")
         (a,b,c) = s["disk"]; c3.metric("Avg Disk (%)", f"{a:.2f}"); c3.write(f"Max: {b:.2f}%"); c3.write(f"Min: {c:.2f}%")
 
+        st.subheader("📐 Percentiles (p50 / p95 / p99)")
+        pct = pd.DataFrame(summary.get("pct", {}), index=["p50", "p95", "p99"]).T
+        st.dataframe(pct.round(2), use_container_width=True)
+        st.caption("Dari sketch harian (±1%); ping_ms tanpa ping gagal (-1).")
+
         st.subheader("🚨 Alert Counts (Based on Current Thresholds)")
-        a_cpu = int((df_f["cpu"] > t["cpu"]).sum()) if "cpu" in df_f.columns else 0
-        a_mem = int((df_f["memory"] > t["memory"]).sum()) if "memory" in df_f.columns else 0
-        a_disk = int((df_f["disk"] > t["disk"]).sum()) if "disk" in df_f.columns else 0
+        alerts = summary["alerts"]
         x1, x2, x3 = st.columns(3)
-        x1.metric(f"CPU > {t['cpu']}%", a_cpu)
-        x2.metric(f"Memory > {t['memory']}%", a_mem)
-        x3.metric(f"Disk > {t['disk']}%", a_disk)
+        x1.metric(f"CPU > {t['cpu']}%", alerts["cpu"])
+        x2.metric(f"Memory > {t['memory']}%", alerts["memory"])
+        x3.metric(f"Disk > {t['disk']}%", alerts["disk"])
 
         st.subheader("🧾 Sample Rows (Latest 10 in Filter) — highlight alerts")
+        sample = load_last(dv, start, end)
         try:
-            st.dataframe(highlight_alerts(df_f.tail(10), t), use_container_width=True)
+            st.dataframe(highlight_alerts(sample, t), use_container_width=True)
         except Exception:
-            st.dataframe(df_f.tail(10), use_container_width=True)
+            st.dataframe(sample, use_container_width=True)
+
+        hist = load_alerts(dv, start, end)
+        with st.expander(f"🚨 Alert History (latest {len(hist)} alert rows in filter)"):
+            st.dataframe(highlight_alerts(hist, t), use_container_width=True)
 
     # Trends
     with tab2:
@@ -239,83 +570,139 @@ def page_analysis(df):
         }
         use_cols = cols_map[trend_choice]
         try:
-            plot = df_f.set_index("timestamp")[use_cols] if "timestamp" in df_f.columns else df_f[use_cols]
-            st.line_chart(plot)
+            plot, tier = load_trend(dv, start, end, st.session_state.chart["points"])
+            line_chart(plot[use_cols])
+            st.caption(f"Resolution: {tier or 'raw'} | Range: {span_text(summary)}")
         except Exception as e:
             st.warning(f"Could not plot chart: {e}")
 
     # Reports
     with tab3:
         st.subheader("📥 Download Reports")
-        csv = df_f.to_csv(index=False).encode("utf-8")
-        left, right = st.columns(2)
-        left.download_button("⬇️ Download CSV", csv, "system_log_report.csv", "text/csv", use_container_width=True)
+        cols = st.multiselect("Columns", VIEW_COLS, default=list(VIEW_COLS))
+        left, mid, right = st.columns(3)
+        # Every export covers exactly the summarized rows: an open window ("Last N days") is
+        # closed at the summary's last row, so rows arriving later do not change the files
+        x_end = summary["span"][1]
+        # Built only when the button is clicked (Streamlit calls the callable), cached per window/columns
+        left.download_button(
+            "⬇️ Download CSV",
+            lambda: csv_export(start, x_end, tuple(cols)),
+            "system_log_report.csv",
+            "text/csv",
+            disabled=not cols,
+            use_container_width=True
+        )
+        mid.download_button(
+            "⬇️ Download CSV (.gz)",
+            lambda: csv_gz_export(start, x_end, tuple(cols), _window_version(x_end, dv)),
+            "system_log_report.csv.gz",
+            "application/gzip",
+            disabled=not cols,
+            use_container_width=True
+        )
+        # pyarrow is in requirements.txt; the guard only covers installs without it
+        has_arrow = importlib.util.find_spec("pyarrow") is not None
+        tip = None if has_arrow else "Requires pyarrow (pip install pyarrow)"
+        p1, p2, _ = st.columns(3)
+        p1.download_button(
+            "⬇️ Download Parquet",
+            lambda: arrow_export("parquet", start, x_end, tuple(cols), _window_version(x_end, dv)),
+            "system_log_report.parquet",
+            "application/vnd.apache.parquet",
+            disabled=not cols or not has_arrow,
+            help=tip,
+            use_container_width=True
+        )
+        p2.download_button(
+            "⬇️ Download Arrow/Feather",
+            lambda: arrow_export("feather", start, x_end, tuple(cols), _window_version(x_end, dv)),
+            "system_log_report.feather",
+            "application/vnd.apache.arrow.file",
+            disabled=not cols or not has_arrow,
+            help=tip,
+            use_container_width=True
+        )
 
         if right.button("🧾 Generate PDF", use_container_width=True):
-            gen = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            tr = "N/A"
-            if "timestamp" in df_f.columns:
-                try:
-                    tr = f"{df_f['timestamp'].min()} to {df_f['timestamp'].max()}"
-                except Exception:
-                    pass
-
-            s = stats_for(df_f)
-            a_cpu = int((df_f["cpu"] > t["cpu"]).sum()) if "cpu" in df_f.columns else 0
-            a_mem = int((df_f["memory"] > t["memory"]).sum()) if "memory" in df_f.columns else 0
-            a_disk = int((df_f["disk"] > t["disk"]).sum()) if "disk" in df_f.columns else 0
-
-            lines = [
-                "System Log Analysis Report",
-                "----------------------------------------",
-                f"Generated at: {gen}",
-                f"Filter: {label}",
-                f"Rows: {len(df_f)}",
-                f"Time range: {tr}",
-                "",
-                "Key Statistics:",
-                f"CPU    avg={s['cpu'][0]:.2f}%  max={s['cpu'][1]:.2f}%  min={s['cpu'][2]:.2f}%",
-                f"Memory avg={s['memory'][0]:.2f}%  max={s['memory'][1]:.2f}%  min={s['memory'][2]:.2f}%",
-                f"Disk   avg={s['disk'][0]:.2f}%  max={s['disk'][1]:.2f}%  min={s['disk'][2]:.2f}%",
-                "",
-                "Thresholds:",
-                f"CPU={t['cpu']}%  Memory={t['memory']}%  Disk={t['disk']}%",
-                "Alert Counts:",
-                f"CPU > {t['cpu']}%: {a_cpu}",
-                f"Memory > {t['memory']}%: {a_mem}",
-                f"Disk > {t['disk']}%: {a_disk}",
-            ]
+            lines = report_lines(summary, label, t)
+            # Trend pages: pyramid min/max pairs, then ≤ PDF_POINTS vertices per chart (LTTB keeps threshold spikes)
+            plot, _ = load_trend(dv, start, x_end, PDF_POINTS)
+            charts = trend_charts(plot, t)
             right.download_button(
                 "⬇️ Download PDF",
-                BytesIO(pdf_bytes(lines)),
+                BytesIO(pdf_bytes(lines, charts)),
                 "system_log_report.pdf",
                 "application/pdf",
                 use_container_width=True
             )
 
+def page_raw_logs():
+    st.title("🗂️ Raw Logs")
+    nav = st.session_state.raw  # page = ids below "before" or above "after" (both None → newest)
+
+    c1, c2, c3 = st.columns([1, 2, 1])
+    size = c1.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+    with c2:
+        j1, j2 = st.columns(2)
+        day = j1.date_input("Jump to date", value=None)
+        tm = j2.time_input("Time", value=None)
+    if c3.button("⏩ Jump", disabled=day is None, use_container_width=True):
+        ts = pd.Timestamp.combine(day, tm or datetime.min.time())
+        # Inclusive: the first row at or after the chosen time heads the page
+        first = id_after(to_epoch(ts))
+        nav["before"], nav["after"] = None if first is None else first + 1, None
+
+    try:
+        page = read_page(nav["before"], size, nav["after"])
+        if nav["after"] is not None and len(page) < size:
+            # Fewer than a page of newer rows left → that is the newest page
+            nav["after"] = None
+            page = read_page(None, size)
+    except Exception as e:
+        st.warning(f"Could not read logs: {e}")
+        return
+
+    newest = nav["before"] is None and nav["after"] is None
+    b1, b2, b3 = st.columns(3)
+    if b1.button("⏮️ Newest", disabled=newest, use_container_width=True):
+        nav["before"], nav["after"] = None, None
+        st.rerun()
+    if b2.button("◀️ Newer", disabled=newest or page.empty, use_container_width=True):
+        nav["before"], nav["after"] = None, int(page["id"].iloc[0])
+        st.rerun()
+    if b3.button("Older ▶️", disabled=len(page) < size, use_container_width=True):
+        nav["before"], nav["after"] = int(page["id"].iloc[-1]), None
+        st.rerun()
+
+    if page.empty:
+        st.info("Tidak ada baris pada halaman ini.")
+        return
+    st.caption(f"id {page['id'].iloc[0]} … {page['id'].iloc[-1]} | "
+               f"{page['timestamp'].iloc[-1]} → {page['timestamp'].iloc[0]}")
+    st.dataframe(highlight_alerts(page, st.session_state.thr), use_container_width=True, hide_index=True)
+
 def do_logout():
     st.session_state.logged_in = False
     st.rerun()
 
 # ---------- Main ----------
-if not st.session_state.logged_in:
-    login()
+st.sidebar.title("📂 Navigation")
+
+# No manual refresh: every rerun polls data_version() once and only stale entries reload
+dv = data_version()
+bounds = ts_bounds(dv)
+if bounds is not None:
+    st.sidebar.caption(f"Latest log: {bounds[1]}")
+
+page = st.sidebar.radio("Select Page", ["Dashboard", "Configuration", "Log Analysis & Report", "Raw Logs", "Logout"])
+if page == "Dashboard":
+    page_dashboard(dv)
+elif page == "Configuration":
+    page_config(dv)
+elif page == "Log Analysis & Report":
+    page_analysis(dv)
+elif page == "Raw Logs":
+    page_raw_logs()
 else:
-    st.sidebar.title("📂 Navigation")
-
-    # Refresh button
-    if st.sidebar.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
-
-    page = st.sidebar.radio("Select Page", ["Dashboard", "Configuration", "Log Analysis & Report", "Logout"])
-    df = load_df()
-
-    if page == "Dashboard":
-        page_dashboard(df)
-    elif page == "Configuration":
-        page_config()
-    elif page == "Log Analysis & Report":
-        page_analysis(df)
-    else:
-        do_logout()
+    do_logout()
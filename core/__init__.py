@@ -0,0 +1,35 @@
+# Streamlit-free core shared by app.py, report.py and scripts. Only the stdlib-only schema
+# module is imported eagerly; everything else (pandas/numpy/pyarrow) loads on first attribute access.
+import importlib
+
+from .schema import (DB, TBL, METRICS, TIERS, AGG_COLS, AGG_MERGE, COLS, VIEW_COLS, DTYPES,
+                     window_sql, migrate, ensure_schema)
+
+_LAZY = {  # submodule → names; a submodule must not share a name with what it exports
+    "data": ["select_sql", "to_frame", "to_epoch", "read_rows", "read_window", "read_tail",
+             "read_page", "id_after", "append_rows"],
+    "stats": ["ALERT_ROWS", "read_summary", "read_alerts", "stats_for", "alert_counts", "percentiles", "summarize",
+              "alert_masks"],
+    "sampling": ["lttb", "minmax", "downsample"],
+    "report": ["PDF_POINTS", "report_lines", "trend_charts"],
+    "pdf": ["pdf_bytes"],
+    "pyramid": ["PYR_BASE", "PYR_LEVELS", "pyramid_path", "sync_pyramid", "bucket_extremes", "pyramid_window"],
+    "ranges": ["build_range_index", "extend_range_index", "range_summary", "window_sorted", "count_above", "threshold_sweep"],
+    "sketch": ["QS", "quantiles", "raw_counts", "sync_sketches", "window_quantiles"],
+    "export": ["EXPORT_CHUNK", "iter_rows", "write_csv", "write_arrow"],
+}
+_WHERE = {name: mod for mod, names in _LAZY.items() for name in names}
+
+__all__ = ["DB", "TBL", "METRICS", "TIERS", "AGG_COLS", "AGG_MERGE", "COLS", "VIEW_COLS", "DTYPES",
+           "window_sql", "migrate", "ensure_schema", *_WHERE]
+
+def __getattr__(name):
+    # PEP 562: import the submodule on first use and cache the name on the package
+    if name not in _WHERE:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_WHERE[name]}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_WHERE))
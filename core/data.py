@@ -0,0 +1,63 @@
+# Row readers (all take an open connection): ts_epoch → datetime64, compact dtypes
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .schema import TBL, COLS, VIEW_COLS, DTYPES, window_sql
+
+def select_sql(cols=COLS):
+    # id is always read (watermark) and dropped again in to_frame() if not asked for
+    cols = ["id"] + [c for c in cols if c != "id"]
+    return f"SELECT {', '.join('ts_epoch AS timestamp' if c == 'timestamp' else c for c in cols)} FROM {TBL}"
+
+def to_frame(df, cols=None):
+    # ts_epoch → datetime64 directly, no string parsing (NULL → NaT)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+    if cols is not None and "id" not in cols and "id" in df.columns:
+        df = df.drop(columns="id")
+    return df.astype({c: t for c, t in DTYPES.items() if c in df.columns})
+
+def to_epoch(ts):
+    return int((pd.Timestamp(ts) - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+def read_rows(conn, after_id=0, cols=COLS):
+    df = pd.read_sql_query(f"{select_sql(cols)} WHERE id > ? ORDER BY id", conn, params=(after_id,))
+    last_id = int(df["id"].iloc[-1]) if len(df) else after_id
+    return to_frame(df, cols), last_id
+
+def read_window(conn, start=None, end=None, cols=VIEW_COLS, last=None):
+    # Rows with a timestamp in [start, end], oldest first; last=n keeps only the newest n
+    where, args = window_sql(start, end)
+    if last is None:
+        return to_frame(pd.read_sql_query(f"{select_sql(cols)} WHERE {where} ORDER BY ts_epoch", conn, params=args), cols)
+    q = f"{select_sql(cols)} WHERE {where} ORDER BY ts_epoch DESC LIMIT ?"
+    df = pd.read_sql_query(q, conn, params=args + [last])
+    return to_frame(df.iloc[::-1].reset_index(drop=True), cols)
+
+def read_tail(conn, n, cols=VIEW_COLS):
+    df = pd.read_sql_query(f"{select_sql(cols)} ORDER BY id DESC LIMIT ?", conn, params=(n,))
+    last_id = int(df["id"].iloc[0]) if len(df) else 0
+    return to_frame(df.iloc[::-1].reset_index(drop=True), cols), last_id
+
+def read_page(conn, before=None, size=50, after=None):
+    # Keyset pagination, shown newest first (no OFFSET scan): the size rows with id < before,
+    # or with after set the size rows with id > after (read upwards, then reversed)
+    if after is not None:
+        q = f"{select_sql(COLS)} WHERE id > ? ORDER BY id LIMIT ?"
+        df = pd.read_sql_query(q, conn, params=(after, size)).iloc[::-1].reset_index(drop=True)
+        return to_frame(df, COLS)
+    where, args = ("", (size,)) if before is None else (" WHERE id < ?", (before, size))
+    return to_frame(pd.read_sql_query(f"{select_sql(COLS)}{where} ORDER BY id DESC LIMIT ?", conn, params=args), COLS)
+
+def id_after(conn, ts):
+    # First id logged at or after epoch ts (None if ts is past the newest row), via idx_system_log_ts_epoch
+    row = conn.execute(f"SELECT id FROM {TBL} WHERE ts_epoch >= ? ORDER BY ts_epoch LIMIT 1", (ts,)).fetchone()
+    return row[0] if row else None
+
+def append_rows(df, new):
+    # Keep ping_status categorical across appends (concat of unequal categoricals → object)
+    if "ping_status" in df.columns and df["ping_status"].dtype != new["ping_status"].dtype:
+        cats = union_categoricals([df["ping_status"], new["ping_status"]]).categories
+        df = df.astype({"ping_status": pd.CategoricalDtype(cats)})
+        new = new.astype({"ping_status": df["ping_status"].dtype})
+    return pd.concat([df, new], ignore_index=True)
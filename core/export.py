@@ -0,0 +1,47 @@
+# Export streamed from SQLite, memory bounded by EXPORT_CHUNK (stdlib only; pyarrow on demand)
+import csv, sqlite3
+from io import TextIOWrapper
+
+from .schema import DB, TBL, METRICS, VIEW_COLS, window_sql
+
+EXPORT_CHUNK = 50_000
+
+def iter_rows(db=DB, start=None, end=None, cols=VIEW_COLS, chunk=EXPORT_CHUNK, epoch=False):
+    # Raw column values in chunks of `chunk` rows; timestamp is the logger's TEXT, or ts_epoch if epoch
+    sel = ", ".join("ts_epoch" if epoch and c == "timestamp" else c for c in cols)
+    where, args = window_sql(start, end)
+    with sqlite3.connect(db) as conn:
+        cur = conn.execute(f"SELECT {sel} FROM {TBL} WHERE {where} ORDER BY ts_epoch", args)
+        while rows := cur.fetchmany(chunk):
+            yield rows
+
+def write_csv(f, db=DB, start=None, end=None, cols=VIEW_COLS):
+    # f is a binary stream (file, BytesIO, GzipFile)
+    t = TextIOWrapper(f, encoding="utf-8", newline="")
+    w = csv.writer(t, lineterminator="\n")
+    w.writerow(cols)
+    for rows in iter_rows(db, start, end, cols):
+        w.writerows(rows)
+    t.flush()
+    t.detach()
+
+def arrow_schema(cols):
+    import pyarrow as pa
+    types = {"id": pa.int64(), "timestamp": pa.timestamp("s"), "ping_status": pa.string(),
+             **{m: pa.float32() for m in METRICS}}
+    return pa.schema([(c, types[c]) for c in cols])
+
+def write_arrow(f, fmt, db=DB, start=None, end=None, cols=VIEW_COLS):
+    # fmt "parquet" or "feather" (Arrow IPC file); written batch by batch, zstd-compressed
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = arrow_schema(cols)
+    if fmt == "parquet":
+        w = pq.ParquetWriter(f, schema, compression="zstd")
+    else:
+        w = pa.ipc.new_file(f, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    with w:
+        for rows in iter_rows(db, start, end, cols, epoch=True):
+            w.write_batch(pa.record_batch(
+                [pa.array(v, type=fld.type) for v, fld in zip(zip(*rows), schema)], schema=schema
+            ))
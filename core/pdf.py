@@ -0,0 +1,79 @@
+# Minimal PDF generator (no external libs)
+import zlib
+from io import BytesIO
+from datetime import datetime, timezone
+
+def _pdf_esc(s):
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _pdf_text(x, y, s, size=8):
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_pdf_esc(s)}) Tj ET"
+
+def _pdf_polyline(pts):
+    return " ".join(f"{x:.1f} {y:.1f} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(pts)) + " S"
+
+def _pdf_chart(title, xs, ys, thr, box):
+    # Vector line chart in box = (x, y, w, h): frame, y grid + labels, dashed threshold, series polyline
+    x0, y0, w, h = box
+    ok = [(x, v) for x, v in zip(xs, ys) if v == v]  # drop NaN
+    ops = ["q 0.5 w 0 G", f"{x0} {y0} {w} {h} re S", _pdf_text(x0, y0 + h + 8, title, 11)]
+    if not ok:
+        return "\n".join(ops + [_pdf_text(x0 + 10, y0 + h / 2, "No data"), "Q"])
+    lo_x, hi_x = ok[0][0], ok[-1][0]
+    lo_y = min(0.0, min(v for _, v in ok))
+    hi_y = max([v for _, v in ok] + ([thr] if thr is not None else [])) * 1.05 or 1.0
+    sx = lambda x: x0 + (x - lo_x) / ((hi_x - lo_x) or 1) * w
+    sy = lambda v: y0 + (v - lo_y) / ((hi_y - lo_y) or 1) * h
+    for k in range(5):
+        v = lo_y + (hi_y - lo_y) * k / 4
+        ops += [f"0.85 G {_pdf_polyline([(x0, sy(v)), (x0 + w, sy(v))])}", _pdf_text(x0 - 30, sy(v) - 3, f"{v:.0f}")]
+    if thr is not None:
+        ops.append(f"1 0 0 RG [4 3] 0 d {_pdf_polyline([(x0, sy(thr)), (x0 + w, sy(thr))])} [] 0 d")
+    ops.append(f"0 0.35 0.75 RG 1 w {_pdf_polyline([(sx(x), sy(v)) for x, v in ok])}")
+    fmt = lambda x: datetime.fromtimestamp(x, timezone.utc).strftime("%Y-%m-%d %H:%M")
+    ops += [_pdf_text(x0, y0 - 12, fmt(lo_x)), _pdf_text(x0 + w - 62, y0 - 12, fmt(hi_x)), "Q"]
+    return "\n".join(ops)
+
+def pdf_bytes(lines, charts=()):
+    # Paginated: as many lines per page as fit, then two charts per page; charts are
+    # (title, epoch xs, ys, threshold or None). One FlateDecode content stream per page.
+    y, lh, bottom = 760, 14, 50
+    per_page = (y - bottom) // lh + 1
+    streams = [
+        f"BT /F1 12 Tf {lh} TL 50 {y} Td " + " T* ".join(f"({_pdf_esc(l)}) Tj" for l in lines[i:i + per_page]) + " ET"
+        for i in range(0, len(lines), per_page)
+    ]
+    for i in range(0, len(charts), 2):
+        streams.append("\n".join(
+            _pdf_chart(*c, box=(70, 450 - 360 * j, 490, 260)) for j, c in enumerate(charts[i:i + 2])
+        ))
+    streams = streams or [""]
+
+    # 1 catalog, 2 page tree, 3 font, then (page, contents) pairs
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for i, stream in enumerate(streams):
+        pid, cid = len(objs) + 1, len(objs) + 2
+        stream += "\n" + _pdf_text(540, 30, f"Page {i + 1}/{len(streams)}", 9)
+        sb = zlib.compress(stream.encode("latin-1", "replace"))
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                    b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % cid)
+        objs.append(b"<< /Length %d /Filter /FlateDecode >> stream\n" % len(sb) + sb + b"\nendstream")
+        kids.append(b"%d 0 R" % pid)
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    off = []
+    for n, body in enumerate(objs, start=1):
+        off.append(out.tell())
+        out.write(b"%d 0 obj " % n + body + b" endobj\n")
+    xref_pos = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % o for o in off))
+    out.write(b"trailer << /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF" % (len(objs) + 1, xref_pos))
+    return out.getvalue()
@@ -0,0 +1,97 @@
+# Time-series pyramid: sidecar file next to log.db, level k has buckets PYR_BASE·2^k s wide
+import math, os, sqlite3, threading
+import numpy as np
+import pandas as pd
+
+from .schema import DB, TBL, METRICS, AGG_COLS, AGG_MERGE
+from .data import to_frame
+
+PYR_BASE, PYR_LEVELS = 16, 22  # 16 s … ~1 year
+PYR_FORMAT = 2  # bumped when the pyramid columns change: an older sidecar table is dropped and rebuilt
+_lock = threading.Lock()  # one writer per process; BEGIN IMMEDIATE covers other processes
+
+def pyramid_path(db=DB):
+    # One sidecar per log file (log.db → log_pyramid.db), shared by the pyramid and the sketches
+    return os.path.splitext(db)[0] + "_pyramid.db"
+
+def _pyramid_conn(db):
+    conn = sqlite3.connect(pyramid_path(db), timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+    row = conn.execute("SELECT value FROM meta WHERE key = 'pyramid_format'").fetchone()
+    if row is None or row[0] != PYR_FORMAT:
+        conn.executescript(f"""
+            DROP TABLE IF EXISTS pyramid;
+            DELETE FROM meta WHERE key = 'last_id';
+            INSERT OR REPLACE INTO meta VALUES ('pyramid_format', {PYR_FORMAT});
+        """)
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS pyramid (level INTEGER, bucket INTEGER, n INTEGER NOT NULL, {AGG_COLS},
+                                            PRIMARY KEY (level, bucket)) WITHOUT ROWID;
+    """)
+    return conn
+
+def _pyramid_levels(df):
+    # Level 0 from raw rows, every next level from the one below (halving bucket count).
+    # Columns in AGG_COLS order; {m}_n counts non-NaN values, an all-NaN bucket has NaN min/max
+    parts = (("n", "count"), ("sum", "sum"), ("min", "min"), ("max", "max"))
+    aggs = {f"{m}_{c}": (m, a) for m in METRICS for c, a in parts}
+    lvl = df.groupby(df["ts_epoch"] // PYR_BASE * PYR_BASE).agg(n=("ts_epoch", "size"), **aggs)
+    up = {"n": "sum", **{c: "sum" if a == "count" else a for c, (_, a) in aggs.items()}}
+    for k in range(PYR_LEVELS):
+        yield k, lvl
+        w = PYR_BASE << (k + 1)
+        lvl = lvl.groupby(lvl.index // w * w).agg(up)
+
+def sync_pyramid(db=DB, chunk=200_000):
+    # Fold rows past the stored id watermark into every level
+    upsert = (f"INSERT INTO pyramid VALUES ({', '.join('?' * (3 + 4 * len(METRICS)))}) "
+              f"ON CONFLICT(level, bucket) DO UPDATE SET {AGG_MERGE}")
+    with _lock:
+        pc = _pyramid_conn(db)
+        try:
+            pc.execute("BEGIN IMMEDIATE")
+            row = pc.execute("SELECT value FROM meta WHERE key = 'last_id'").fetchone()
+            last_id = row[0] if row else 0
+            with sqlite3.connect(db) as conn:
+                if (conn.execute(f"SELECT MAX(id) FROM {TBL}").fetchone()[0] or 0) < last_id:
+                    pc.execute("DELETE FROM pyramid")  # log was recreated → rebuild
+                    last_id = 0
+                q = f"SELECT id, ts_epoch, {', '.join(METRICS)} FROM {TBL} WHERE id > ? ORDER BY id"
+                for df in pd.read_sql_query(q, conn, params=(last_id,), chunksize=chunk):
+                    if df.empty:
+                        continue
+                    last_id = int(df["id"].iloc[-1])
+                    df = df.dropna(subset=["ts_epoch"]).astype({"ts_epoch": "int64"})
+                    for k, lvl in _pyramid_levels(df):
+                        pc.executemany(upsert, ([k, b, *r] for b, r in zip(lvl.index.tolist(), lvl.values.tolist())))
+            pc.execute("INSERT OR REPLACE INTO meta VALUES ('last_id', ?)", (last_id,))
+            pc.commit()
+        finally:
+            pc.close()
+
+def bucket_extremes(df, width):
+    # Bucket rows (timestamp = bucket start, {m}_min, {m}_max) → two points per bucket: the min at
+    # the start, the max half a bucket later; spikes survive and downsample() picks what to draw
+    ts = df["timestamp"].to_numpy("int64")
+    out = pd.DataFrame({"timestamp": np.column_stack([ts, ts + width // 2]).ravel()})
+    for m in METRICS:
+        out[m] = np.column_stack([df[f"{m}_min"].to_numpy("float64"), df[f"{m}_max"].to_numpy("float64")]).ravel()
+    return to_frame(out).set_index("timestamp")
+
+def pyramid_window(db, lo, hi, points):
+    # Finest level with at most `points` buckets in [lo, hi] → reads O(points) rows,
+    # returned as min/max pairs (≤ 2·points rows) for downsample() to reduce
+    level = max(0, math.ceil(math.log2(max(hi - lo, 1) / (PYR_BASE * points))))
+    level = min(level, PYR_LEVELS - 1)
+    w = PYR_BASE << level
+    ext = ", ".join(f"{m}_min, {m}_max" for m in METRICS)
+    pc = _pyramid_conn(db)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT bucket AS timestamp, {ext} FROM pyramid "
+            "WHERE level = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+            pc, params=(level, lo // w * w, hi),
+        )
+    finally:
+        pc.close()
+    return bucket_extremes(df, w), f"{w} s buckets (min/max)"
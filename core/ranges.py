@@ -0,0 +1,163 @@
+# Range statistics over a loaded frame: per-block sums, non-NaN counts and alert counts (prefix
+# over whole blocks) and block sparse tables (min/max), so any [start, end] window costs two
+# searchsorted + O(BLOCK) for the partial blocks at its edges. Besides the values themselves it
+# holds O(rows / BLOCK) numbers per metric, and new rows are appended, never rebuilt.
+# Same result shape as read_summary().
+import numpy as np
+import pandas as pd
+
+from .stats import KEYS
+
+BLOCK = 512  # rows per block; partial blocks at the window edges are scanned directly
+ABOVE_MAX = 4  # cached alert block counts (metric, threshold) before starting over
+
+def _grow(a, n):
+    # Capacity ≥ n (doubling), so appends are amortized O(1) per row; callers slice [:n]
+    if len(a) >= n:
+        return a
+    out = np.empty(max(n, 2 * len(a)), dtype=a.dtype)
+    out[:len(a)] = a
+    return out
+
+def _append_prefix(p, x):
+    return np.concatenate([p, p[-1] + np.cumsum(x, dtype=p.dtype)])
+
+def _sparse(blocks, fn):
+    # levels[k][b] = fn over blocks b .. b + 2^k - 1
+    levels = [blocks]
+    while (1 << len(levels)) <= len(blocks):
+        prev, h = levels[-1], 1 << (len(levels) - 1)
+        levels.append(fn(prev[:-h], prev[h:]))
+    return levels
+
+def _whole(i, j):
+    # Whole blocks bi .. bj - 1 inside rows i:j (none if bi >= bj)
+    return -(-i // BLOCK), j // BLOCK
+
+def _total(v, p, i, j, edge):
+    # Block-additive quantity over v[i:j]: whole blocks from the prefix p, edge(rows) for the rest
+    bi, bj = _whole(i, j)
+    if bi >= bj:
+        return edge(v[i:j])
+    return p[bj] - p[bi] + edge(v[i:bi * BLOCK]) + edge(v[bj * BLOCK:j])
+
+def _extreme(c, key, fn, i, j):
+    # fn (np.fmin/np.fmax, NaN-skipping) over v[i:j]: whole blocks via two sparse-table lookups
+    v, (bi, bj) = c["v"], _whole(i, j)
+    if bi >= bj:
+        return fn.reduce(v[i:j])
+    k = (bj - bi).bit_length() - 1
+    out = fn(c[key][k][bi], c[key][k][bj - (1 << k)])
+    if i < bi * BLOCK:
+        out = fn(out, fn.reduce(v[i:bi * BLOCK]))
+    if bj * BLOCK < j:
+        out = fn(out, fn.reduce(v[bj * BLOCK:j]))
+    return out
+
+def _nansum(seg):
+    return np.nansum(seg, dtype="float64")
+
+def _count(seg):
+    return np.count_nonzero(~np.isnan(seg))
+
+def build_range_index(df):
+    ix = {"n": 0, "ts": np.empty(0, dtype="int64"), "cols": {}, "above": {}}
+    extend_range_index(ix, df)
+    return ix
+
+def extend_range_index(ix, df):
+    # Append df's rows with a timestamp; they must come in order after the indexed ones (append-only
+    # log), otherwise nothing changes and False is returned → rebuild. The first fill may sort.
+    # Not thread-safe: the caller serializes this with readers.
+    n = ix["n"]
+    cols = [k for k in KEYS if k in df.columns]
+    if n and cols != list(ix["cols"]):
+        return False
+    ok = df["timestamp"].notna().to_numpy()
+    sel = slice(None) if ok.all() else ok
+    ts = df["timestamp"].to_numpy()[sel].astype("datetime64[s]").astype("int64")
+    if not len(ts):
+        return True
+    order = None if (ts[1:] >= ts[:-1]).all() else np.argsort(ts, kind="stable")
+    if n and (order is not None or ts[0] < ix["ts"][n - 1]):
+        return False
+    m = n + len(ts)
+    ix["ts"] = _grow(ix["ts"], m)
+    ix["ts"][n:m] = ts if order is None else ts[order]
+    for k in cols:
+        c = ix["cols"].setdefault(k, {"v": np.empty(0, dtype="float32"), "sum": np.zeros(1),
+                                      "cnt": np.zeros(1, dtype="int32"), "min": None, "max": None})
+        v = df[k].to_numpy("float32")[sel]
+        c["v"] = _grow(c["v"], m)
+        c["v"][n:m] = v if order is None else v[order]
+        # Blocks completed by these rows (a trailing partial block is only ever an edge)
+        b0, b1 = len(c["sum"]) - 1, m // BLOCK
+        if b1 == b0:
+            continue
+        blk = c["v"][b0 * BLOCK:b1 * BLOCK].reshape(-1, BLOCK)
+        c["sum"] = _append_prefix(c["sum"], np.nansum(blk, axis=1, dtype="float64"))
+        c["cnt"] = _append_prefix(c["cnt"], (~np.isnan(blk)).sum(axis=1))
+        for key, fn in (("min", np.fmin), ("max", np.fmax)):
+            lvl0 = fn.reduce(blk, axis=1)
+            c[key] = _sparse(lvl0 if c[key] is None else np.concatenate([c[key][0], lvl0]), fn)
+        for (mk, thr), p in list(ix["above"].items()):
+            if mk == k:
+                ix["above"][(mk, thr)] = _append_prefix(p, (blk > thr).sum(axis=1))
+    ix["n"] = m
+    return True
+
+def _above(ix, k, thr):
+    # Alert count prefix over whole blocks, built on first use of a threshold (O(n) once)
+    p = ix["above"].get((k, thr))
+    if p is None:
+        if len(ix["above"]) >= ABOVE_MAX:
+            ix["above"].clear()
+        c = ix["cols"][k]
+        nb = len(c["sum"]) - 1
+        p = np.zeros(nb + 1, dtype="int32")
+        np.cumsum((c["v"][:nb * BLOCK].reshape(nb, BLOCK) > thr).sum(axis=1), out=p[1:])
+        ix["above"][(k, thr)] = p
+    return p
+
+def _rows(ix, start=None, end=None):
+    # [start, end] epoch window → row slice i:j of the index
+    ts = ix["ts"][:ix["n"]]
+    i = 0 if start is None else int(np.searchsorted(ts, start, "left"))
+    j = len(ts) if end is None else int(np.searchsorted(ts, end, "right"))
+    return i, max(i, j)
+
+def range_summary(ix, thr, start=None, end=None):
+    ts = ix["ts"]
+    i, j = _rows(ix, start, end)
+    n = j - i
+    stats, alerts = {}, {}
+    for k in KEYS:
+        c = ix["cols"].get(k)
+        cnt = 0 if c is None or n == 0 else int(_total(c["v"], c["cnt"], i, j, _count))
+        if cnt == 0:
+            stats[k], alerts[k] = (0.0, 0.0, 0.0), 0
+            continue
+        mean = _total(c["v"], c["sum"], i, j, _nansum) / cnt
+        stats[k] = (float(mean), float(_extreme(c, "max", np.fmax, i, j)), float(_extreme(c, "min", np.fmin, i, j)))
+        t = thr[k]
+        alerts[k] = int(_total(c["v"], _above(ix, k, t), i, j, lambda seg: np.count_nonzero(seg > t)))
+    return {"rows": n, "span": (int(ts[i]), int(ts[j - 1])) if n else None, "stats": stats, "alerts": alerts}
+
+# ---------- Threshold what-if (sorted values: any threshold is one searchsorted) ----------
+def window_sorted(ix, start=None, end=None):
+    # Per-metric sorted values of a window, NaN dropped (O(n log n) once per window)
+    i, j = _rows(ix, start, end)
+    out = {}
+    for k, c in ix["cols"].items():
+        v = c["v"][i:j]
+        out[k] = np.sort(v[~np.isnan(v)])
+    return out
+
+def count_above(sv, thr):
+    # Number of values > thr (thr scalar or array), same rule as alert_counts()
+    return len(sv) - np.searchsorted(sv, thr, "right")
+
+def threshold_sweep(sorted_vals, thrs=range(101)):
+    # Alert count per metric for every threshold in thrs (frame indexed by threshold)
+    thrs = np.asarray(thrs)
+    return pd.DataFrame({k: count_above(sv, thrs) for k, sv in sorted_vals.items()}, index=pd.Index(thrs, name="threshold"))
@@ -0,0 +1,57 @@
+# Report content: text lines + trend chart series for pdf_bytes()
+from datetime import datetime, timezone
+
+from .schema import METRICS
+from .sampling import downsample
+
+PDF_POINTS = 400  # points per trend chart in the PDF report
+
+def report_lines(summary, label, thr, generated=None):
+    # Text part of the PDF report, from a read_summary()/summarize() dict
+    gen = (generated or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    tr = "N/A"
+    if summary["span"] is not None:
+        fmt = lambda e: datetime.fromtimestamp(e, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        tr = " to ".join(map(fmt, summary["span"]))
+    s, a, t = summary["stats"], summary["alerts"], thr
+    pct = []
+    if summary.get("pct"):
+        names = {"cpu": "CPU   ", "memory": "Memory", "disk": "Disk  ", "ping_ms": "Ping  "}
+        pct = ["", "Percentiles (p50 / p95 / p99):"] + [
+            f"{names[m]} " + " / ".join(f"{x:.2f}" for x in v) + (" ms" if m == "ping_ms" else " %")
+            for m, v in summary["pct"].items()
+        ]
+    return [
+        "System Log Analysis Report",
+        "----------------------------------------",
+        f"Generated at: {gen}",
+        f"Filter: {label}",
+        f"Rows: {summary['rows']}",
+        f"Time range: {tr}",
+        "",
+        "Key Statistics:",
+        f"CPU    avg={s['cpu'][0]:.2f}%  max={s['cpu'][1]:.2f}%  min={s['cpu'][2]:.2f}%",
+        f"Memory avg={s['memory'][0]:.2f}%  max={s['memory'][1]:.2f}%  min={s['memory'][2]:.2f}%",
+        f"Disk   avg={s['disk'][0]:.2f}%  max={s['disk'][1]:.2f}%  min={s['disk'][2]:.2f}%",
+        *pct,
+        "",
+        "Thresholds:",
+        f"CPU={t['cpu']}%  Memory={t['memory']}%  Disk={t['disk']}%",
+        "Alert Counts:",
+        f"CPU > {t['cpu']}%: {a['cpu']}",
+        f"Memory > {t['memory']}%: {a['memory']}",
+        f"Disk > {t['disk']}%: {a['disk']}",
+    ]
+
+def trend_charts(plot, thr, points=PDF_POINTS):
+    # pdf_bytes() charts from a timestamp-indexed frame of metric columns; each metric is
+    # downsampled on its own, so every chart has at most `points` vertices
+    units = {"ping_ms": "Ping (ms)"}
+    charts = []
+    for m in METRICS:
+        if m not in plot.columns:
+            continue
+        s = downsample(plot[[m]].dropna(), points, thr=thr)[m]
+        xs = s.index.values.astype("datetime64[s]").astype("int64").tolist()
+        charts.append((units.get(m, f"{m.capitalize()} (%)"), xs, s.tolist(), thr.get(m)))
+    return charts
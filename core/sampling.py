@@ -0,0 +1,53 @@
+# Downsampling: chart payload independent of range length (numpy only, frames in / frames out)
+import numpy as np
+
+def lttb(x, y, n, thr=None):
+    # Largest-Triangle-Three-Buckets → indices to keep; a bucket holding a value > thr keeps its max
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, n - 1).astype(int)  # n-2 buckets between first and last point
+    out, a = [0], 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nx, ny = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            nx, ny = x[-1], y[-1]
+        seg = y[lo:hi]
+        if thr is not None and seg.max() > thr:
+            j = lo + int(seg.argmax())
+        else:
+            area = np.abs((x[a] - nx) * (seg - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+            j = lo + int(area.argmax())
+        out.append(j)
+        a = j
+    out.append(size - 1)
+    return np.asarray(out)
+
+def minmax(y, n):
+    # Min/max envelope: n/2 buckets, each keeps its lowest and highest point
+    size = len(y)
+    if n >= size:
+        return np.arange(size)
+    edges = np.linspace(0, size, max(n // 2, 1) + 1).astype(int)
+    idx = [lo + k for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo
+           for k in (int(y[lo:hi].argmin()), int(y[lo:hi].argmax()))]
+    return np.unique(idx)
+
+def downsample(df, n=2000, method="lttb", thr=None):
+    # Per-column picks merged on the shared timestamp index; each column gets n / ncols
+    # so the merged frame stays within n rows
+    if len(df) <= n or not len(df.columns):
+        return df
+    x = df.index.values.astype("int64").astype("float64")
+    n, keep = max(n // len(df.columns), 3), []
+    for c in df.columns:
+        y = df[c].to_numpy(dtype="float64")
+        ok = np.flatnonzero(~np.isnan(y))
+        if method == "minmax":
+            pick = minmax(y[ok], n)
+        else:
+            pick = lttb(x[ok], y[ok], n, (thr or {}).get(c))
+        keep.append(ok[pick])
+    return df.iloc[np.unique(np.concatenate(keep))]
@@ -0,0 +1,113 @@
+# Table layout, rollup/trigger SQL and migrations (stdlib only: imported eagerly by core)
+import sqlite3
+
+DB, TBL = "log.db", "system_log"
+COLS = ["id", "timestamp", "cpu", "memory", "disk", "ping_status", "ping_ms"]
+VIEW_COLS = ("timestamp", "cpu", "memory", "disk", "ping_status", "ping_ms")  # what the pages use (no id)
+DTYPES = {"cpu": "float32", "memory": "float32", "disk": "float32", "ping_ms": "float32", "ping_status": "category"}
+
+# ---------- Rollups (count/sum/min/max per metric and time bucket) ----------
+METRICS = ["cpu", "memory", "disk", "ping_ms"]
+TIERS = {"1d": 86400, "1h": 3600, "1m": 60}  # coarsest first
+
+# Shared by the rollup tables and the pyramid: column list + upsert merge of two partial aggregates.
+# {m}_n counts non-NULL values (mean = {m}_sum / {m}_n); a NULL side never wipes the other one out.
+AGG_COLS = ", ".join(f"{m}_n INTEGER NOT NULL, {m}_sum REAL, {m}_min REAL, {m}_max REAL" for m in METRICS)
+AGG_MERGE = "n = n + excluded.n, " + ", ".join(
+    f"{m}_n = {m}_n + excluded.{m}_n, "
+    f"{m}_sum = COALESCE({m}_sum + excluded.{m}_sum, {m}_sum, excluded.{m}_sum), "
+    f"{m}_min = COALESCE(MIN({m}_min, excluded.{m}_min), {m}_min, excluded.{m}_min), "
+    f"{m}_max = COALESCE(MAX({m}_max, excluded.{m}_max), {m}_max, excluded.{m}_max)" for m in METRICS
+)
+
+def window_sql(start=None, end=None):
+    # WHERE clause + args for an epoch window (None = open end), range-scanned on idx_system_log_ts_epoch
+    if start is not None and end is not None:
+        return "ts_epoch BETWEEN ? AND ?", [start, end]
+    if start is not None:
+        return "ts_epoch >= ?", [start]
+    if end is not None:
+        return "ts_epoch <= ?", [end]
+    return "ts_epoch IS NOT NULL", []
+
+def _rollup_sql():
+    aggs = ", ".join(f"COUNT({m}), SUM({m}), MIN({m}), MAX({m})" for m in METRICS)
+    vals = ", ".join(f"NEW.{m} IS NOT NULL, NEW.{m}, NEW.{m}, NEW.{m}" for m in METRICS)
+    # Rollup trigger may run before trg_system_log_ts_epoch, so derive the epoch itself
+    e = "COALESCE(NEW.ts_epoch, CAST(strftime('%s', NEW.timestamp) AS INTEGER))"
+    sql = [f"DROP TRIGGER IF EXISTS trg_{TBL}_rollup;"]
+    body = []
+    for name, sec in TIERS.items():
+        tbl = f"{TBL}_{name}"
+        sql.append(f"DROP TABLE IF EXISTS {tbl};")
+        sql.append(f"CREATE TABLE IF NOT EXISTS {tbl} (bucket INTEGER PRIMARY KEY, n INTEGER NOT NULL, {AGG_COLS});")
+        sql.append(
+            f"INSERT INTO {tbl} SELECT ts_epoch / {sec} * {sec}, COUNT(*), {aggs} "
+            f"FROM {TBL} WHERE ts_epoch IS NOT NULL GROUP BY 1;"
+        )
+        body.append(
+            f"INSERT INTO {tbl} VALUES ({e} / {sec} * {sec}, 1, {vals}) "
+            f"ON CONFLICT(bucket) DO UPDATE SET {AGG_MERGE};"
+        )
+    # Append-only log: deletes/updates on system_log are not reflected
+    sql.append(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{TBL}_rollup AFTER INSERT ON {TBL} WHEN {e} IS NOT NULL\n"
+        "BEGIN\n" + "\n".join(body) + "\nEND;"
+    )
+    return "\n".join(sql)
+
+# ---------- Schema migrations (tracked in PRAGMA user_version) ----------
+MIGRATIONS = [
+    f"CREATE INDEX IF NOT EXISTS idx_{TBL}_timestamp ON {TBL}(timestamp);",
+    # INTEGER epoch seconds (naive timestamps read as UTC, so wall-clock round-trips unchanged);
+    # the trigger fills it for rows inserted by the logger, which only writes the TEXT column.
+    f"""
+    ALTER TABLE {TBL} ADD COLUMN ts_epoch INTEGER;
+    UPDATE {TBL} SET ts_epoch = CAST(strftime('%s', timestamp) AS INTEGER);
+    CREATE INDEX IF NOT EXISTS idx_{TBL}_ts_epoch ON {TBL}(ts_epoch);
+    DROP INDEX IF EXISTS idx_{TBL}_timestamp;
+    CREATE TRIGGER IF NOT EXISTS trg_{TBL}_ts_epoch AFTER INSERT ON {TBL}
+    WHEN NEW.ts_epoch IS NULL
+    BEGIN
+        UPDATE {TBL} SET ts_epoch = CAST(strftime('%s', NEW.timestamp) AS INTEGER) WHERE id = NEW.id;
+    END;
+    """,
+    "",  # rollups without per-metric counts (NULL-unsafe merge); replaced by the next step
+    _rollup_sql(),
+]
+
+def _statements(sql):
+    # executescript() would COMMIT first, so split into statements (trigger bodies stay whole)
+    buf = ""
+    for part in sql.split(";"):
+        buf += part + ";"
+        if sqlite3.complete_statement(buf):
+            if buf.strip(" \n;"):
+                yield buf
+            buf = ""
+
+def migrate(conn):
+    # One IMMEDIATE transaction per step, version re-read under the write lock: concurrent
+    # callers (warm-up thread, sessions, report.py) never apply a step twice or half
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        ver = conn.execute("PRAGMA user_version").fetchone()[0]
+        if ver >= len(MIGRATIONS):
+            conn.rollback()
+            return
+        try:
+            for stmt in _statements(MIGRATIONS[ver]):
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version = {ver + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def ensure_schema(db=DB):
+    # Raises if the table is not there yet
+    with sqlite3.connect(db) as conn:
+        migrate(conn)
+    return True
@@ -0,0 +1,106 @@
+# Quantile sketches: per-day log-bucket histograms (DDSketch-style, relative error ≤ ALPHA),
+# stored as (metric, bucket, key, n) rows in the pyramid sidecar, so merging = GROUP BY key
+import sqlite3, threading
+import numpy as np
+import pandas as pd
+
+from .schema import DB, TBL, METRICS, window_sql
+from .pyramid import pyramid_path
+
+QS = (0.5, 0.95, 0.99)
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+ZERO = -(1 << 20)  # key of exact zeros (log undefined)
+SKETCH_SEC = 86400  # one sketch per metric per day; an hourly one would hold about as many keys as samples
+_lock = threading.Lock()
+
+def sketch_keys(v):
+    # Bucket key per value: ceil(log_gamma(v)); NaN and v < 0 (ping_ms = -1 is a failed ping) are dropped
+    v = v[v >= 0]
+    keys = np.full(len(v), ZERO, dtype="int64")
+    pos = v > 0
+    keys[pos] = np.ceil(np.log(v[pos]) / np.log(GAMMA))
+    return keys
+
+def key_value(k):
+    # Bucket midpoint (in relative terms): within ALPHA of every value that maps to k
+    return 0.0 if k == ZERO else 2 * GAMMA ** k / (GAMMA + 1)
+
+def quantiles(counts, qs=QS):
+    # counts: Series key → n; NaN for an empty sketch
+    counts = counts[counts > 0].sort_index()
+    if counts.empty:
+        return tuple(float("nan") for _ in qs)
+    cum = counts.to_numpy().cumsum()
+    return tuple(key_value(int(counts.index[np.searchsorted(cum, q * (cum[-1] - 1), "right")])) for q in qs)
+
+def _sketch_conn(db):
+    conn = sqlite3.connect(pyramid_path(db), timeout=30)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS sketch (metric TEXT, bucket INTEGER, key INTEGER, n INTEGER NOT NULL,
+                                           PRIMARY KEY (metric, bucket, key)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+    """)
+    return conn
+
+def sync_sketches(db=DB, chunk=200_000):
+    # Fold rows past the stored id watermark into the day sketches (same scheme as sync_pyramid)
+    upsert = "INSERT INTO sketch VALUES (?, ?, ?, ?) ON CONFLICT(metric, bucket, key) DO UPDATE SET n = n + excluded.n"
+    with _lock:
+        sc = _sketch_conn(db)
+        try:
+            sc.execute("BEGIN IMMEDIATE")
+            row = sc.execute("SELECT value FROM meta WHERE key = 'sketch_last_id'").fetchone()
+            last_id = row[0] if row else 0
+            with sqlite3.connect(db) as conn:
+                if (conn.execute(f"SELECT MAX(id) FROM {TBL}").fetchone()[0] or 0) < last_id:
+                    sc.execute("DELETE FROM sketch")  # log was recreated → rebuild
+                    last_id = 0
+                q = f"SELECT id, ts_epoch, {', '.join(METRICS)} FROM {TBL} WHERE id > ? ORDER BY id"
+                for df in pd.read_sql_query(q, conn, params=(last_id,), chunksize=chunk):
+                    if df.empty:
+                        continue
+                    last_id = int(df["id"].iloc[-1])
+                    df = df.dropna(subset=["ts_epoch"])
+                    day = df["ts_epoch"].to_numpy("int64") // SKETCH_SEC * SKETCH_SEC
+                    for m in METRICS:
+                        v = df[m].to_numpy("float64")
+                        ok = v >= 0
+                        n = pd.DataFrame({"day": day[ok], "key": sketch_keys(v[ok])}).value_counts()
+                        sc.executemany(upsert, ((m, b, k, c) for (b, k), c in zip(n.index.tolist(), n.tolist())))
+            sc.execute("INSERT OR REPLACE INTO meta VALUES ('sketch_last_id', ?)", (last_id,))
+            sc.commit()
+        finally:
+            sc.close()
+
+def raw_counts(conn, lo=None, hi=None):
+    # Sketch counts straight from raw rows in [lo, hi]: {metric: Series key → n}
+    where, args = window_sql(lo, hi)
+    df = pd.read_sql_query(f"SELECT {', '.join(METRICS)} FROM {TBL} WHERE {where}", conn, params=args)
+    return {m: pd.Series(sketch_keys(df[m].to_numpy("float64"))).value_counts() for m in METRICS}
+
+def window_quantiles(db, lo, hi, qs=QS):
+    # p-quantiles per metric for [lo, hi]: whole days merged from the stored sketches,
+    # the partial days at both edges bucketed from raw rows
+    d0 = -(-lo // SKETCH_SEC) * SKETCH_SEC  # first day starting at/after lo
+    d1 = (hi + 1) // SKETCH_SEC * SKETCH_SEC  # end of the last day finishing at/before hi
+    with sqlite3.connect(db) as conn:
+        if d0 >= d1:
+            parts = [raw_counts(conn, lo, hi)]
+        else:
+            parts = [raw_counts(conn, lo, d0 - 1), raw_counts(conn, d1, hi)]
+    if d0 < d1:
+        sc = _sketch_conn(db)
+        try:
+            df = pd.read_sql_query(
+                "SELECT metric, key, SUM(n) AS n FROM sketch WHERE bucket >= ? AND bucket < ? GROUP BY metric, key",
+                sc, params=(d0, d1),
+            )
+        finally:
+            sc.close()
+        parts.append({m: g.set_index("key")["n"] for m, g in df.groupby("metric")})
+    out = {}
+    for m in METRICS:
+        counts = [p[m] for p in parts if m in p and len(p[m])]
+        out[m] = quantiles(pd.concat(counts).groupby(level=0).sum() if counts else pd.Series(dtype="int64"), qs)
+    return out
@@ -0,0 +1,67 @@
+# Statistics & alerts: pushed down to SQLite for a window, or over an already loaded frame
+import numpy as np
+import pandas as pd
+
+from .schema import TBL, METRICS, VIEW_COLS, window_sql
+from .data import select_sql, to_frame, to_epoch
+from .sketch import QS
+
+ALERT_ROWS = 2000  # alert history table size
+KEYS = ["cpu", "memory", "disk"]  # metrics with thresholds
+
+def read_summary(conn, thr, start=None, end=None):
+    # One pass over the window: rows, time span, avg/max/min and alert counts per metric
+    aggs = ", ".join(f"AVG({k}), MAX({k}), MIN({k})" for k in KEYS)
+    above = ", ".join(f"SUM({k} > ?)" for k in KEYS)
+    where, args = window_sql(start, end)
+    n, lo, hi, *vals = conn.execute(
+        f"SELECT COUNT(*), MIN(ts_epoch), MAX(ts_epoch), {aggs}, {above} FROM {TBL} WHERE {where}",
+        [thr[k] for k in KEYS] + args,
+    ).fetchone()
+    return {
+        "rows": n,
+        "span": None if lo is None else (lo, hi),
+        "stats": {k: tuple(float(v or 0) for v in vals[3 * i:3 * i + 3]) for i, k in enumerate(KEYS)},
+        "alerts": {k: int(v or 0) for k, v in zip(KEYS, vals[3 * len(KEYS):])},
+    }
+
+def read_alerts(conn, thr, start=None, end=None, n=ALERT_ROWS, cols=VIEW_COLS):
+    # Latest n rows in the window where any metric is above its threshold, oldest first
+    where, args = window_sql(start, end)
+    above = " OR ".join(f"{k} > ?" for k in KEYS)
+    q = f"{select_sql(cols)} WHERE {where} AND ({above}) ORDER BY ts_epoch DESC LIMIT ?"
+    df = pd.read_sql_query(q, conn, params=args + [thr[k] for k in KEYS] + [n])
+    return to_frame(df.iloc[::-1].reset_index(drop=True), cols)
+
+def stats_for(df):
+    out = {}
+    for k in KEYS:
+        if k in df.columns and len(df) > 0:
+            out[k] = (float(df[k].mean()), float(df[k].max()), float(df[k].min()))
+        else:
+            out[k] = (0.0, 0.0, 0.0)
+    return out
+
+def alert_counts(df, thr):
+    return {k: int((df[k] > thr[k]).sum()) if k in df.columns else 0 for k in KEYS}
+
+def percentiles(df, qs=QS):
+    # Exact counterpart of sketch.window_quantiles() for a loaded frame (same value filter and rank rule)
+    out = {}
+    for m in METRICS:
+        v = df[m].to_numpy("float64") if m in df.columns else np.empty(0)
+        v = v[v >= 0]
+        out[m] = tuple(float(x) for x in np.quantile(v, qs, method="lower")) if len(v) else tuple(np.nan for _ in qs)
+    return out
+
+def summarize(df, thr):
+    # read_summary() shape (+ exact "pct") from a loaded frame (report.py slices one read per window)
+    ts = df["timestamp"].dropna() if "timestamp" in df.columns else pd.Series(dtype="datetime64[ns]")
+    span = None if ts.empty else (to_epoch(ts.min()), to_epoch(ts.max()))
+    return {"rows": len(df), "span": span, "stats": stats_for(df), "alerts": alert_counts(df, thr),
+            "pct": percentiles(df)}
+
+def alert_masks(df, thr):
+    # One vectorized comparison per metric: {col: boolean array}
+    return {c: (pd.to_numeric(df[c], errors="coerce") > thr[c]).to_numpy()
+            for c in KEYS if c in df.columns}
@@ -0,0 +1,63 @@
+# Headless report generation (no Streamlit): one DB read, then a PDF/CSV per window.
+#   python report.py --from 2025-11-01 --to 2025-11-30 --every day --format pdf csv --out reports
+import argparse, os, sqlite3
+from datetime import datetime
+import pandas as pd
+
+from core import DB, METRICS, VIEW_COLS, ensure_schema, read_window, to_epoch, summarize, report_lines, trend_charts, pdf_bytes
+
+PERIODS = {"day": "D", "week": "W", "month": "M"}
+
+def periods(start, end, every):
+    # (label, file stem, first ts, last ts) per window covering start..end (whole days);
+    # weeks/months are clipped to the range, so --from mid-week never reaches before it
+    first, last = start.normalize(), end.normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    if every == "all":
+        return [(f"Custom: {first.date()} to {last.date()}", f"{first:%Y-%m-%d}_{last:%Y-%m-%d}", first, last)]
+    out = []
+    for p in pd.period_range(start, end, freq=PERIODS[every]):
+        lo, hi = max(p.start_time, first), min(p.end_time.floor("s"), last)
+        label = f"{every.capitalize()}: {lo.date()}" + ("" if every == "day" else f" to {hi.date()}")
+        out.append((label, f"{lo:%Y-%m-%d}", lo, hi))
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate system_log reports without the dashboard.")
+    ap.add_argument("--db", default=DB)
+    ap.add_argument("--from", dest="start", required=True, type=pd.Timestamp, help="first day (YYYY-MM-DD)")
+    ap.add_argument("--to", dest="end", required=True, type=pd.Timestamp, help="last day (YYYY-MM-DD)")
+    ap.add_argument("--every", choices=["day", "week", "month", "all"], default="day")
+    ap.add_argument("--format", nargs="+", choices=["pdf", "csv"], default=["pdf"])
+    ap.add_argument("--out", default="reports")
+    ap.add_argument("--cpu", type=int, default=80)
+    ap.add_argument("--memory", type=int, default=85)
+    ap.add_argument("--disk", type=int, default=90)
+    ap.add_argument("--no-charts", action="store_true", help="text-only PDFs")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        ap.error(f"database not found: {args.db}")
+    thr = {"cpu": args.cpu, "memory": args.memory, "disk": args.disk}
+    wins = periods(args.start, args.end, args.every)
+
+    # The only scan: every window is a slice of this frame (ordered by ts_epoch)
+    ensure_schema(args.db)
+    with sqlite3.connect(args.db) as conn:
+        df = read_window(conn, to_epoch(wins[0][2]), to_epoch(wins[-1][3]), VIEW_COLS)
+    df = df.dropna(subset=["timestamp"]).reset_index(drop=True)
+
+    os.makedirs(args.out, exist_ok=True)
+    gen = datetime.now()
+    for label, stem, lo, hi in wins:
+        sub = df.iloc[df["timestamp"].searchsorted(lo, "left"):df["timestamp"].searchsorted(hi, "right")]
+        path = os.path.join(args.out, f"system_log_{stem}")
+        if "pdf" in args.format:
+            charts = [] if args.no_charts or sub.empty else trend_charts(sub.set_index("timestamp")[METRICS], thr)
+            with open(path + ".pdf", "wb") as f:
+                f.write(pdf_bytes(report_lines(summarize(sub, thr), label, thr, gen), charts))
+        if "csv" in args.format:
+            sub.to_csv(path + ".csv", index=False)
+        print(f"{path}: {len(sub)} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+
+from core import TBL, ensure_schema
+
+# Same table as the logger creates (system_log in log.db)
+CREATE = f"""
+CREATE TABLE {TBL} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    cpu REAL,
+    memory REAL,
+    disk REAL,
+    ping_status TEXT,
+    ping_ms REAL
+)
+"""
+
+def insert(db, rows):
+    # rows: (timestamp, cpu, memory, disk, ping_status, ping_ms), inserted the way the logger does
+    with sqlite3.connect(db) as conn:
+        conn.executemany(
+            f"INSERT INTO {TBL} (timestamp, cpu, memory, disk, ping_status, ping_ms) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "log.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(CREATE)
+    ensure_schema(path)
+    return path
@@ -0,0 +1,17 @@
+import sqlite3
+
+from core import id_after, read_page, to_epoch
+from conftest import insert
+
+def test_pages_and_jump(db):
+    insert(db, [(f"2025-01-01 00:00:{s:02}", s, 50, 40, "UP", 10) for s in range(10)])  # ids 1..10
+    with sqlite3.connect(db) as conn:
+        assert read_page(conn, size=3)["id"].tolist() == [10, 9, 8]
+        assert read_page(conn, before=8, size=3)["id"].tolist() == [7, 6, 5]
+        # Newer than a page: the next ids up, still shown newest first
+        assert read_page(conn, size=3, after=5)["id"].tolist() == [8, 7, 6]
+        # Jump is inclusive: the row logged exactly at the time heads the page
+        first = id_after(conn, to_epoch("2025-01-01 00:00:04"))
+        assert first == 5
+        assert read_page(conn, before=first + 1, size=3)["id"].tolist() == [5, 4, 3]
+        assert id_after(conn, to_epoch("2025-01-02")) is None
@@ -0,0 +1,28 @@
+import re
+import zlib
+
+import pytest
+
+from core import pdf_bytes
+
+CHART = ("CPU (%)", list(range(0, 3600, 60)), [float(i % 90) for i in range(60)], 80)
+
+@pytest.mark.parametrize("lines, charts", [([], ()), (["Système é (x)"] * 120, [CHART] * 3)])
+def test_xref_offsets_point_at_objects(lines, charts):
+    pdf = pdf_bytes(lines, charts)
+    xref = int(re.search(rb"startxref\n(\d+)\n%%EOF$", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref\n")
+    count = int(re.match(rb"xref\n0 (\d+)\n", pdf[xref:]).group(1))
+    offsets = re.findall(rb"(\d{10}) 00000 n \n", pdf[xref:])
+    assert len(offsets) == count - 1
+    for n, off in enumerate(offsets, start=1):
+        assert pdf[int(off):].startswith(b"%d 0 obj " % n)
+
+def test_pages_and_streams():
+    pdf = pdf_bytes(["line"] * 120, [CHART] * 3)
+    kids = re.search(rb"/Kids \[([^\]]*)\] /Count (\d+)", pdf)
+    assert int(kids.group(2)) == kids.group(1).count(b" R") == 3 + 2  # 51 lines per page, 2 charts per page
+    for m in re.finditer(rb"<< /Length (\d+) /Filter /FlateDecode >> stream\n", pdf):
+        data = pdf[m.end():m.end() + int(m.group(1))]
+        assert pdf[m.end() + int(m.group(1)):].startswith(b"\nendstream")
+        zlib.decompress(data)
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from core import PYR_LEVELS, downsample, pyramid_path, pyramid_window, sync_pyramid, to_epoch
+from conftest import insert
+
+ROWS = [("2025-01-01 00:00:01", None, 50, 40, "UP", 10), ("2025-01-01 00:00:02", 70, 50, 40, "UP", 10)]
+
+def levels(db):
+    with sqlite3.connect(pyramid_path(db)) as pc:
+        return pc.execute("SELECT level, n, cpu_n, cpu_sum, cpu_min, cpu_max FROM pyramid ORDER BY level").fetchall()
+
+@pytest.mark.parametrize("chunk", [1, 200_000])
+def test_null_metric_does_not_poison_levels(db, chunk):
+    # chunk=1: the all-NaN bucket is written first and merged with the 70 afterwards
+    insert(db, ROWS)
+    sync_pyramid(db, chunk=chunk)
+    assert levels(db) == [(k, 2, 1, 70.0, 70.0, 70.0) for k in range(PYR_LEVELS)]
+
+def test_old_format_is_rebuilt(db):
+    insert(db, ROWS)
+    with sqlite3.connect(pyramid_path(db)) as pc:
+        pc.executescript("""
+            CREATE TABLE pyramid (level INTEGER, bucket INTEGER, n INTEGER, cpu_sum REAL, PRIMARY KEY (level, bucket));
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER);
+            INSERT INTO meta VALUES ('last_id', 2);
+        """)
+    sync_pyramid(db)
+    assert levels(db)[0] == (0, 2, 1, 70.0, 70.0, 70.0)
+
+def test_window_keeps_extremes(db):
+    # One 100% spike among 20k rows at 1 s: a 50-point window still shows it (and the minimum)
+    rows = [(f"2025-01-01 {s // 3600:02}:{s // 60 % 60:02}:{s % 60:02}", 100 if s == 12345 else 20 + s % 7, 50, 40, "UP", 10)
+            for s in range(20_000)]
+    insert(db, rows)
+    sync_pyramid(db)
+    plot, _ = pyramid_window(db, to_epoch("2025-01-01"), to_epoch("2025-01-01 05:33:19"), 50)
+    assert len(plot) <= 100
+    assert plot["cpu"].max() == 100 and plot["cpu"].min() == 20
+    assert downsample(plot, 20, "lttb", {"cpu": 80})["cpu"].max() == 100
+
+def test_sidecar_per_database(tmp_path):
+    assert pyramid_path("log.db") == "log_pyramid.db"
+    assert pyramid_path(str(tmp_path / "log (1).db")) == str(tmp_path / "log (1)_pyramid.db")
+    assert pyramid_path(str(tmp_path / "log.db")) != pyramid_path(str(tmp_path / "log (1).db"))
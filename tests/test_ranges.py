@@ -0,0 +1,67 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import (VIEW_COLS, build_range_index, extend_range_index, range_summary, read_rows, read_summary,
+                  to_epoch, window_sorted)
+from core.stats import KEYS
+from conftest import insert
+
+THRS = [{"cpu": 80, "memory": 85, "disk": 90}, {"cpu": 50, "memory": 20, "disk": 0}, {"cpu": 99, "memory": 60, "disk": 45}]
+
+@pytest.fixture
+def filled(db):
+    # ~5 blocks of rows, values with one decimal like the logger, some NULL metrics
+    rng = np.random.default_rng(1)
+    ts = pd.date_range("2025-01-01", periods=2600, freq="10s")
+    v = rng.uniform(0, 100, size=(len(ts), 3)).round(1)
+    v[::37, 0] = np.nan
+    v[:700, 2] = np.nan  # a whole block without disk readings
+    insert(db, [(str(t), *(None if np.isnan(x) else float(x) for x in r), "UP", 10.0) for t, r in zip(ts, v)])
+    with sqlite3.connect(db) as conn:
+        df, _ = read_rows(conn, 0, VIEW_COLS)
+    return db, df
+
+WINDOWS = [(None, None), ("2025-01-01 00:00:00", "2025-01-01 00:30:00"), ("2025-01-01 01:23:45", "2025-01-01 06:00:00"),
+           ("2025-01-01 02:00:05", "2025-01-01 02:00:55"), (None, "2025-01-01 03:00:00"), ("2025-01-01 07:00:00", None),
+           ("2024-01-01 00:00:00", "2024-01-02 00:00:00")]
+
+def check(ix, db, thr, start, end):
+    start = None if start is None else to_epoch(start)
+    end = None if end is None else to_epoch(end)
+    got = range_summary(ix, thr, start, end)
+    with sqlite3.connect(db) as conn:
+        want = read_summary(conn, thr, start, end)
+    assert (got["rows"], got["span"], got["alerts"]) == (want["rows"], want["span"], want["alerts"])
+    for k in KEYS:
+        assert np.allclose(got["stats"][k], want["stats"][k], rtol=1e-5), k
+
+@pytest.mark.parametrize("start, end", WINDOWS)
+def test_range_summary_matches_sql(filled, start, end):
+    db, df = filled
+    ix = build_range_index(df)
+    for thr in THRS:  # more thresholds than ABOVE_MAX: cached block counts are dropped and rebuilt
+        check(ix, db, thr, start, end)
+
+@pytest.mark.parametrize("chunk", [1, 300, 511, 512, 1000])
+def test_extend_matches_build(filled, chunk):
+    db, df = filled
+    ix = build_range_index(df.iloc[:0])
+    for i in range(0, len(df), chunk):
+        range_summary(ix, THRS[0])  # cached alert counts must be extended as rows arrive
+        assert extend_range_index(ix, df.iloc[i:i + chunk])
+    for start, end in WINDOWS:
+        check(ix, db, THRS[0], start, end)
+    full = window_sorted(build_range_index(df))
+    for k, sv in window_sorted(ix).items():
+        assert np.array_equal(sv, full[k])
+
+def test_out_of_order_rows_are_refused(filled):
+    _, df = filled
+    ix = build_range_index(df.iloc[:1000])
+    assert not extend_range_index(ix, df.iloc[500:600])
+    assert ix["n"] == 1000
+    assert extend_range_index(ix, df.iloc[1000:])
+    assert ix["n"] == len(df)
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from core import PDF_POINTS, trend_charts
+from report import periods
+
+def test_weeks_and_months_are_clipped():
+    wins = periods(pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-10"), "week")
+    assert [w[1] for w in wins] == ["2025-01-01", "2025-01-06"]
+    assert wins[0][2] == pd.Timestamp("2025-01-01") and wins[-1][3] == pd.Timestamp("2025-01-10 23:59:59")
+    (label, stem, lo, hi), = periods(pd.Timestamp("2025-03-10"), pd.Timestamp("2025-03-12"), "month")
+    assert (label, stem) == ("Month: 2025-03-10 to 2025-03-12", "2025-03-10")
+    assert (lo, hi) == (pd.Timestamp("2025-03-10"), pd.Timestamp("2025-03-12 23:59:59"))
+
+def test_days_and_all():
+    assert len(periods(pd.Timestamp("2025-01-30"), pd.Timestamp("2025-02-02"), "day")) == 4
+    (label, stem, lo, hi), = periods(pd.Timestamp("2025-01-30 12:00"), pd.Timestamp("2025-02-02"), "all")
+    assert stem == "2025-01-30_2025-02-02" and lo == pd.Timestamp("2025-01-30")
+
+
+def test_each_chart_within_points():
+    rng = np.random.default_rng(2)
+    idx = pd.date_range("2025-01-01", periods=60_000, freq="10s")
+    plot = pd.DataFrame(rng.uniform(0, 100, size=(len(idx), 4)), index=idx, columns=["cpu", "memory", "disk", "ping_ms"])
+    plot.iloc[12_345, 0] = 100.0
+    charts = trend_charts(plot, {"cpu": 80, "memory": 85, "disk": 90})
+    assert [c[0] for c in charts] == ["Cpu (%)", "Memory (%)", "Disk (%)", "Ping (ms)"]
+    for title, xs, ys, thr in charts:
+        assert len(xs) == len(ys) <= PDF_POINTS
+    assert max(charts[0][2]) == 100.0  # spike kept (LTTB with the threshold)
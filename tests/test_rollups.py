@@ -0,0 +1,28 @@
+import sqlite3
+
+import pytest
+
+from core import TBL, TIERS, ensure_schema
+from conftest import CREATE, insert
+
+def bucket(db, tier):
+    with sqlite3.connect(db) as conn:
+        return conn.execute(f"SELECT n, cpu_n, cpu_sum, cpu_min, cpu_max FROM {TBL}_{tier}").fetchall()
+
+@pytest.mark.parametrize("tier", TIERS)
+def test_null_metric_does_not_poison_bucket(db, tier):
+    insert(db, [("2025-01-01 00:00:01", None, 50, 40, "UP", 10), ("2025-01-01 00:00:02", 70, 50, 40, "UP", 10)])
+    assert bucket(db, tier) == [(2, 1, 70.0, 70.0, 70.0)]
+
+@pytest.mark.parametrize("tier", TIERS)
+def test_backfill_matches_trigger(db, tier, tmp_path):
+    rows = [("2025-01-01 00:00:01", None, 50, 40, "UP", 10), ("2025-01-01 00:00:02", 70, 50, 40, "UP", 10),
+            ("2025-01-01 00:00:03", 30, 50, 40, "DOWN", -1)]
+    insert(db, rows)
+    # Same rows inserted before the migration: rebuilt by the backfill instead of the trigger
+    fresh = str(tmp_path / "fresh.db")
+    with sqlite3.connect(fresh) as conn:
+        conn.execute(CREATE)
+    insert(fresh, rows)
+    ensure_schema(fresh)
+    assert bucket(fresh, tier) == bucket(db, tier) == [(3, 2, 100.0, 30.0, 70.0)]
@@ -0,0 +1,38 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import METRICS, read_window, percentiles, sync_sketches, to_epoch, window_quantiles
+from core.sketch import ALPHA
+from conftest import insert
+
+@pytest.fixture
+def filled(db):
+    rng = np.random.default_rng(0)
+    ts = pd.date_range("2025-01-01 06:00", "2025-01-04 18:00", freq="60s")
+    v = rng.gamma(2.0, 15.0, size=(len(ts), 4)).clip(0, 100)
+    v[::97, 0] = np.nan
+    v[::50, 1] = 0.0
+    v[::13, 3] = -1  # failed ping
+    insert(db, [(str(t), *(None if np.isnan(x) else float(x) for x in r[:3]), "UP", float(r[3])) for t, r in zip(ts, v)])
+    sync_sketches(db)
+    return db
+
+@pytest.mark.parametrize("lo, hi", [
+    ("2025-01-01 00:00", "2025-01-05 00:00"),  # whole days from the sketches + both edges raw
+    ("2025-01-01 09:30", "2025-01-04 11:15"),
+    ("2025-01-02 03:00", "2025-01-02 04:00"),  # inside one day: raw rows only
+])
+def test_window_quantiles_within_alpha_of_exact(filled, lo, hi):
+    lo, hi = to_epoch(lo), to_epoch(hi)
+    got = window_quantiles(filled, lo, hi)
+    with sqlite3.connect(filled) as conn:
+        exact = percentiles(read_window(conn, lo, hi))
+    for m in METRICS:
+        assert np.allclose(got[m], exact[m], rtol=ALPHA, atol=0), m
+
+def test_empty_window(filled):
+    got = window_quantiles(filled, to_epoch("2026-01-01"), to_epoch("2026-01-02"))
+    assert all(np.isnan(x) for m in METRICS for x in got[m])